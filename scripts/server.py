@@ -2,9 +2,9 @@
 
 import logging
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 import google.cloud.logging
-import pandas as pd
 
 from pprl import config
 from pprl.matching import cloud, local, perform_matching
@@ -64,37 +64,46 @@ def main():
         logging.info("Downloading embedder...")
         embedder = cloud.download_embedder(parties, operator)
 
+        # Both parties are I/O-bound (GCS and KMS), so handle them concurrently
         logging.info("Preparing assets...")
-        data_1, dek_1 = prepare_party_assets(party_1, operator, location, version_1)
-        data_2, dek_2 = prepare_party_assets(party_2, operator, location, version_2)
+        with ThreadPoolExecutor(max_workers=len(parties)) as executor:
+            futures = [
+                executor.submit(cloud.prepare_party_assets, party, operator, location, version)
+                for party, version in zip(parties, (version_1, version_2))
+            ]
+            (data_1, dek_1), (data_2, dek_2) = (future.result() for future in futures)
 
         logging.info("Performing matching...")
         outputs = perform_matching(data_1, data_2, embedder)
 
         logging.info("Uploading results...")
-        for party, output, dek in zip(parties, outputs, (dek_1, dek_2)):
-            logging.info(f"Uploading results for {party}...")
-            cloud.upload_party_results(output, dek, party, operator)
+        with ThreadPoolExecutor(max_workers=len(parties)) as executor:
+            futures = [
+                executor.submit(cloud.upload_party_results, output, dek, party, operator)
+                for party, output, dek in zip(parties, outputs, (dek_1, dek_2))
+            ]
+            for future in futures:
+                future.result()
 
     else:
         logging.basicConfig(encoding="utf-8", level=logging.INFO)
 
         logging.info("Setting up environment and file paths...")
         operator, party_1, party_2, *_ = load_environment_variables()
-        inpath_1, outpath_1 = build_local_file_paths(party_1)
-        inpath_2, outpath_2 = build_local_file_paths(party_2)
+        inpath_1, outpath_1 = local.build_local_file_paths(party_1)
+        inpath_2, outpath_2 = local.build_local_file_paths(party_2)
 
         logging.info("Loading files...")
-        embedder = load_embedder()
-        data_1 = pd.read_json(inpath_1)
-        data_2 = pd.read_json(inpath_2)
+        embedder = local.load_embedder()
+        data_1 = local.read_local_data(inpath_1)
+        data_2 = local.read_local_data(inpath_2)
 
         logging.info("Performing matching...")
         output_1, output_2 = perform_matching(data_1, data_2, embedder)
 
         logging.info("Saving results...")
-        output_1.to_json(outpath_1)
-        output_2.to_json(outpath_2)
+        local.write_local_data(output_1, outpath_1)
+        local.write_local_data(output_2, outpath_2)
 
     logging.info("Done!")
 
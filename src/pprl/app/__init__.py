@@ -1,5 +1,6 @@
 """Party-side Flask app for embedding, encrypting and uploading data."""
 
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
 import flask
@@ -30,6 +31,7 @@ def home():
     parties = (environ.get("PARTY_1_PROJECT"), environ.get("PARTY_2_PROJECT"))
     app.config["env"] = environ
     app.config["parties"] = parties
+    app.config["party_nums"] = {party: i + 1 for i, party in enumerate(parties)}
 
     return flask.render_template("home.html", parties=parties)
 
@@ -115,7 +117,7 @@ def upload_to_gcp(data, embedder):
 
     location = environ.get("PROJECT_LOCATION", "global")
 
-    party_num = next(i + 1 for i, part in enumerate(app.config["parties"]) if party == part)
+    party_num = app.config["party_nums"][party]
     version = environ.get(f"PARTY_{party_num}_KEY_VERSION", 1)
 
     data_encrypted, dek = encryption.encrypt_data(data)
@@ -123,10 +125,18 @@ def upload_to_gcp(data, embedder):
     app.config["dek"] = dek
 
     store = app.config.get("store")
-    bucket = store.get_bucket(f"{party}-bucket")
-
-    bucket.blob("encrypted_data").upload_from_string(data_encrypted)
-    bucket.blob("encrypted_dek").upload_from_string(dek_encrypted)
+    bucket = store.bucket(f"{party}-bucket")
+
+    # Uploading from bytes gives the size up front, so small payloads
+    # go in one request rather than a resumable session
+    uploads = {"encrypted_data": data_encrypted, "encrypted_dek": dek_encrypted}
+    with ThreadPoolExecutor(max_workers=len(uploads)) as executor:
+        futures = [
+            executor.submit(bucket.blob(name).upload_from_string, contents)
+            for name, contents in uploads.items()
+        ]
+        for future in futures:
+            future.result()
 
     return flask.redirect(flask.url_for("check_results"))
 
@@ -144,14 +154,13 @@ def check_results_post():
 
     party = app.config.get("party")
     store = app.config.get("store")
-    bucket = store.get_bucket(f"{party}-bucket")
+    bucket = store.bucket(f"{party}-bucket")
 
-    blob = bucket.blob("encrypted_output")
-    if blob.exists():
-        blob = bucket.get_blob("encrypted_output")
+    blob = bucket.get_blob("encrypted_output")
+    if blob is not None:
         if blob.updated > app.config.get("submission_time"):
-            encrypted = blob.download_as_string()
-            app.config["embedder"] = bucket.blob("embedder.pkl").download_as_string()
+            encrypted = blob.download_as_bytes(raw_download=True, checksum=None)
+            app.config["embedder"] = bucket.blob("embedder.pkl").download_as_bytes()
             app.config["processed_data"] = encryption.decrypt_data(
                 encrypted, app.config.get("dek")
             )
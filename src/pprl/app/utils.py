@@ -1,6 +1,8 @@
 """Utility functions for the party-side app."""
 
+import functools
 import os
+import pickle
 import zipfile
 from io import BytesIO
 
@@ -11,6 +13,17 @@ import pandas as pd
 from pprl.embedder import features
 from pprl.embedder.embedder import EmbeddedDataFrame, Embedder
 
+NGRAMS = [1, 2, 3, 4]
+FFARGS = {"name": {"ngram_length": NGRAMS, "use_gen_skip_grams": True}}
+
+COLUMN_TYPES = {
+    "name": features.gen_name_features,
+    "dob": features.gen_dateofbirth_features,
+    "sex": features.gen_sex_features,
+    "misc_features": features.gen_misc_features,
+    "misc_shingled_features": features.gen_misc_shingled_features,
+}
+
 
 def check_is_csv(path: str) -> bool:
     """
@@ -27,9 +40,9 @@ def check_is_csv(path: str) -> bool:
         Whether the file name follows the pattern `{name}.csv` or not.
     """
 
-    *parts, extension = os.path.basename(path).split(os.path.extsep)
+    root, extension = os.path.splitext(os.path.basename(path))
 
-    return bool(parts) and any(part for part in parts) and extension.lower() == "csv"
+    return bool(root) and extension.lower() == ".csv"
 
 
 def assign_columns(form: dict, feature_funcs: dict) -> tuple[list, list, dict]:
@@ -76,6 +89,10 @@ def download_files(
     """
     Serialize, compress, and send a data frame with its embedder.
 
+    The embedder is pickled with the standard library where possible,
+    falling back to `dill` for objects that `pickle` cannot handle.
+    Either is readable by `Embedder.from_pickle()`.
+
     Parameters
     ----------
     dataframe : EmbeddedDataFrame
@@ -94,12 +111,17 @@ def download_files(
         its embedder.
     """
 
+    # Standard pickle is much faster than dill but cannot handle lambdas
+    try:
+        pickled = pickle.dumps(embedder, protocol=5)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        pickled = dill.dumps(embedder)
+
     stream = BytesIO()
-    with zipfile.ZipFile(stream, "w") as z:
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as z:
         with z.open("data.csv", "w") as f:
             dataframe.to_csv(f, index=False)
-        with z.open("embedder.pkl", "w") as f:
-            dill.dump(embedder, f)
+        z.writestr("embedder.pkl", pickled)
 
     stream.seek(0)
     name = ".".join((party, archive, "zip"))
@@ -107,6 +129,25 @@ def download_files(
     return flask.send_file(stream, as_attachment=True, download_name=name)
 
 
+@functools.lru_cache(maxsize=16)
+def _get_embedder(salt: str) -> Embedder:
+    """
+    Get the app embedder for a salt, creating it on first use.
+
+    Parameters
+    ----------
+    salt : str
+        Cryptographic salt to add to tokens before hashing.
+
+    Returns
+    -------
+    embedder : Embedder
+        Embedder using the app feature factory and arguments.
+    """
+
+    return Embedder(feature_factory=COLUMN_TYPES, ff_args=FFARGS, salt=salt)
+
+
 def convert_dataframe_to_bf(
     df: pd.DataFrame, colspec: dict, other_columns: None | list = None, salt: str = ""
 ) -> pd.DataFrame:
@@ -135,22 +176,7 @@ def convert_dataframe_to_bf(
         Data frame of bloom-filtered data.
     """
 
-    NGRAMS = [1, 2, 3, 4]
-    FFARGS = {"name": {"ngram_length": NGRAMS, "use_gen_skip_grams": True}}
-
-    column_types_dict = {
-        "name": features.gen_name_features,
-        "dob": features.gen_dateofbirth_features,
-        "sex": features.gen_sex_features,
-        "misc_features": features.gen_misc_features,
-        "misc_shingled_features": features.gen_misc_shingled_features,
-    }
-
-    embedder = Embedder(
-        feature_factory=column_types_dict,
-        ff_args=FFARGS,
-        salt=salt,
-    )
+    embedder = _get_embedder(salt)
 
     df_bloom_filter = embedder.embed(df, colspec, update_norms=True, update_thresholds=True)
     output = df_bloom_filter.anonymise(other_columns)
@@ -1,5 +1,6 @@
 """Functions for handling PPRL configuration."""
 
+import functools
 import inspect
 import os
 from pathlib import Path
@@ -35,10 +36,36 @@ def _find_directory(kind: str, what: str | None = None) -> Path:
     return where
 
 
+@functools.lru_cache(maxsize=8)
+def _read_environment(path: str, mtime: None | float) -> dict[str, None | str]:
+    """
+    Read a configuration file, caching on its path and modified time.
+
+    Parameters
+    ----------
+    path : str
+        Location of the configuration file to read.
+    mtime : float, optional
+        Last modification time of the file, or `None` if it does not
+        exist. Only used to invalidate the cache when the file changes.
+
+    Returns
+    -------
+    config : collections.OrderedDict
+        Mapping of the key-value pairs in the configuration file.
+    """
+
+    return dotenv.dotenv_values(path)
+
+
 def load_environment(path: None | str = None) -> dict[str, None | str]:
     """
     Load the configuration file as a dictionary.
 
+    The parsed file is cached until it is next modified, so repeated
+    calls do not re-read the file from disk. Each call gets its own
+    copy, so changing it does not affect later calls.
+
     Parameters
     ----------
     path : str, optional
@@ -48,18 +75,23 @@ def load_environment(path: None | str = None) -> dict[str, None | str]:
 
     Returns
     -------
-    config : collections.OrderedDict
+    config : dict
         Mapping of the key-value pairs in the configuration file.
     """
 
     if path is None:
         path = os.path.join(PPRL_ROOT, ".env")
 
-    return dotenv.dotenv_values(path)
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+
+    return dict(_read_environment(path, mtime))
 
 
 PPRL_ROOT = _find_directory("")
-DIR_DATA_RAW = _find_directory("data", "raw")
-DIR_DATA_INTERIM = _find_directory("data", "interim")
-DIR_DATA_PROCESSED = _find_directory("data", "processed")
-DIR_LOGS = _find_directory("log")
+DIR_DATA_RAW = PPRL_ROOT / "data" / "raw"
+DIR_DATA_INTERIM = PPRL_ROOT / "data" / "interim"
+DIR_DATA_PROCESSED = PPRL_ROOT / "data" / "processed"
+DIR_LOGS = PPRL_ROOT / "log"
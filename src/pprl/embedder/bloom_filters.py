@@ -1,6 +1,7 @@
 """Module for the Bloom filter encoder."""
 
 import hashlib
+from typing import Iterable
 
 
 class BloomFilterEncoder:
@@ -41,6 +42,27 @@ class BloomFilterEncoder:
 
         self.hash_function = hashlib.sha256
 
+        # Each gram is hashed once per index with the index and salt appended
+        self._suffixes = [(str(i) + self.salt).encode("UTF-8") for i in range(num_hashes)]
+
+    def _hash_feature(self, feature: list[str]) -> list[int]:
+        """Hash every gram with every suffix into (repeated) indices."""
+        hash_function, size, offset = self.hash_function, self.size, self.offset
+        suffixes = self._suffixes
+
+        # Encode each gram once, then hash and index every token in bulk
+        grams = [str(gram).encode("UTF-8") for gram in feature]
+        tokens = [gram + suffix for gram in grams for suffix in suffixes]
+        digests = [hash_function(token).digest() for token in tokens]
+
+        # Reducing modulo a power of two is the same as masking its low
+        # bits, so we only need to convert the low (first) eight bytes
+        if size & (size - 1) == 0 and size <= 1 << 64:
+            mask = size - 1
+            return [(int.from_bytes(digest[:8], "little") & mask) + offset for digest in digests]
+
+        return [int.from_bytes(digest, "little") % size + offset for digest in digests]
+
     def bloom_filter_vector_collision_fraction(
         self, feature: list[str]
     ) -> tuple[list[int], float]:
@@ -66,17 +88,11 @@ class BloomFilterEncoder:
         >>> bfe.bloom_filter_vector_collision_fraction(["a","b","c"])
         ([334, 1013, 192, 381, 18, 720], 0.0)
         """
-        vec_idx: list = []
+        vec_idx_deduped = [*set(self._hash_feature(feature))]
 
-        for gram in feature:
-            for i in range(self.num_hashes):
-                utf_string_with_salt = (str(gram) + str(i) + str(self.salt)).encode("UTF-8")
-                digest = self.hash_function(utf_string_with_salt).digest()
-                digest_as_int = (int.from_bytes(digest, "little") % self.size) + self.offset
-                vec_idx.append(digest_as_int)
-
-        vec_idx_deduped = [*set(vec_idx)]
-        collision_fraction = 1 - len(vec_idx_deduped) / len(vec_idx)
+        # Every gram gives `num_hashes` indices, so no need to keep them all
+        num_idx = len(feature) * self.num_hashes
+        collision_fraction = 1 - len(vec_idx_deduped) / num_idx if num_idx else 0.0
 
         return vec_idx_deduped, collision_fraction
 
@@ -104,3 +120,30 @@ class BloomFilterEncoder:
         vec_idx_deduped, _ = self.bloom_filter_vector_collision_fraction(feature)
 
         return vec_idx_deduped
+
+    def bloom_filter_vectors(self, features: Iterable[list[str]]) -> list[list[int]]:
+        """Convert a batch of feature vectors into Bloom vector indices.
+
+        This is equivalent to calling `bloom_filter_vector()` on each
+        feature vector, but skips the collision fraction calculation.
+        Grams tend to repeat across rows (common names, dates and so
+        on), so each distinct gram is only hashed once per batch.
+
+        Parameters
+        ----------
+        features: Iterable[list]
+            Feature vectors to be converted, such as a column of a data
+            frame.
+
+        Returns
+        -------
+        vector_idxs: list[list]
+            Index values for each Bloom filter vector, in the same order
+            as `features`.
+        """
+        features = [[str(gram) for gram in feature] for feature in features]
+
+        grams = {gram for feature in features for gram in feature}
+        gram_idxs = {gram: self._hash_feature([gram]) for gram in grams}
+
+        return [[*{idx for gram in feature for idx in gram_idxs[gram]}] for feature in features]
@@ -6,9 +6,9 @@ from typing import Iterable
 
 import dill
 import numpy as np
-import numpy.ma as ma
 import pandas as pd
 from scipy.optimize import linear_sum_assignment
+from scipy.sparse import csr_matrix, issparse, spmatrix
 
 from pprl.embedder.bloom_filters import BloomFilterEncoder
 
@@ -88,7 +88,7 @@ class EmbeddedDataFrame(pd.DataFrame):
         if update_thresholds:
             self.update_thresholds()
 
-    def to_bloom_matrix(self) -> np.ndarray:
+    def to_bloom_matrix(self, sparse: bool = False) -> np.ndarray | csr_matrix:
         """Convert Bloom filter indices into a binary matrix.
 
         The matrix has a row for each row in the EDF. The number of
@@ -97,18 +97,45 @@ class EmbeddedDataFrame(pd.DataFrame):
         the ones corresponding to hashed features.
         This representation is used in the `Embedder.compare()` method.
 
+        Parameters
+        ----------
+        sparse: bool
+            Whether to return a `scipy.sparse.csr_matrix` rather than a
+            dense array. Bloom filters are mostly zeros, so the sparse
+            form is much cheaper to multiply. Its entries are single
+            precision to match `scm_matrix`. Defaults to `False`.
+
         Returns
         -------
-        X: np.ndarray
+        X: np.ndarray or scipy.sparse.csr_matrix
             Binary array of size `(len(self), self.embedder.bf_size + self.embedder.offset)`.
         """
         assert self.embedder_checksum == self.embedder.checksum, "Checksum mismatch"
 
         bf_length = self.embedder.bf_size + self.embedder.offset
         N = len(self)
+
+        # Flatten the indices and set every one in a single assignment
+        lengths = np.fromiter(map(len, self["bf_indices"]), dtype=np.intp, count=N)
+        cols = np.fromiter(
+            it.chain.from_iterable(self["bf_indices"]), dtype=np.intp, count=lengths.sum()
+        )
+
+        if sparse:
+            indptr = np.concatenate(([0], np.cumsum(lengths)))
+            X = csr_matrix(
+                (np.ones(len(cols), dtype=np.float32), cols, indptr), shape=(N, bf_length)
+            )
+
+            # Repeated indices should still give a binary matrix
+            X.sum_duplicates()
+            X.data[:] = 1.0
+
+            return X
+
+        rows = np.repeat(np.arange(N), lengths)
         X = np.zeros((N, bf_length))
-        for i in range(N):
-            X[i, self["bf_indices"].iloc[i]] = 1.0
+        X[rows, cols] = 1.0
 
         return X
 
@@ -123,14 +150,32 @@ class EmbeddedDataFrame(pd.DataFrame):
         Attributes
         ----------
         data.thresholds: numpy.ndarray
-            Column for maximum similarity of each row within the EDF.
+            Column for maximum similarity of each row within the EDF, in
+            single precision like the scores from `Embedder.compare`.
         """
         assert self.embedder_checksum == self.embedder.checksum, "Checksum mismatch"
 
-        similarities = self.embedder.compare(self, self, require_thresholds=False)
-        np.fill_diagonal(similarities, -np.Inf)
+        if "bf_norms" not in self.columns:
+            self.update_norms()
+
+        X = self.to_bloom_matrix(sparse=True)
+        scm_X = self.embedder._scm_product(X)
+        inv_norms = 1 / np.array(self.bf_norms)
 
-        self["thresholds"] = np.max(similarities, 1)
+        # Take the maximum over blocks of rows so that we never hold the
+        # full N by N similarity matrix, ignoring each row's own score
+        N = len(self)
+        block_size = max(1, 2**24 // max(N, 1))
+        thresholds = np.empty(N, dtype=np.float32)
+        for start in range(0, N, block_size):
+            stop = min(start + block_size, N)
+            similarities = _to_dense(X[start:stop] @ scm_X)
+            similarities *= inv_norms[start:stop, None]
+            similarities *= inv_norms[None, :]
+            similarities[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+            thresholds[start:stop] = similarities.max(axis=1)
+
+        self["thresholds"] = thresholds
 
         return self
 
@@ -264,24 +309,25 @@ class SimilarityArray(np.ndarray):
         similarity score above the `abs_cutoff`, respecting `thresholds`
         if present. This method does not guarantee no duplicates.
         """
-        S = ma.array(self.copy())
+        S = np.asarray(self)
+
+        # Track the valid pairs with a boolean mask instead of masking S
+        valid = S >= abs_cutoff
 
         if require_thresholds:
             if isinstance(self.thresholds, tuple):
-                S[S < S.thresholds[0][:, None] + rel_cutoff] = ma.masked
-                S[S < S.thresholds[1] + rel_cutoff] = ma.masked
+                valid &= ~(S < self.thresholds[0][:, None] + rel_cutoff)
+                valid &= ~(S < self.thresholds[1] + rel_cutoff)
             else:
                 raise ValueError("Thresholds are required for matching")
 
-        S[S < abs_cutoff] = ma.masked
-
-        match = ma.where(S >= abs_cutoff)  # ma.where(S) would also work
-
         if hungarian:
             # Compute linear assignment (Hungarian match)
             hungarian_match = linear_sum_assignment(S, maximize=True)
-            hungarian_mask = ~S.mask[hungarian_match]
+            hungarian_mask = valid[hungarian_match]
             match = tuple([x[hungarian_mask] for x in hungarian_match])
+        else:
+            match = np.nonzero(valid)
 
         return match
 
@@ -379,10 +425,12 @@ class Embedder:
         """Initialise matrices as identity matrices of dimension `bf_size` + `offset`."""
         return np.eye((self.bf_size + self.offset), dtype=np.float32)
 
-    def _compute_checksum(self) -> str:
+    def _compute_checksum(self, legacy: bool = False) -> str:
         """Compute a checksum on important attributes of the Embedder instance.
 
-        To check for functional equality of two instances
+        To check for functional equality of two instances. If `legacy`
+        is `True`, the SCM matrix is hashed by its string form, as it
+        was for embedders pickled by earlier versions.
         """
         res = hashlib.md5()
 
@@ -392,7 +440,10 @@ class Embedder:
             res.update(dill.dumps(v))
 
         # bytes from SCM matrix
-        res.update(str(self.scm_matrix).encode("utf-8"))
+        if legacy:
+            res.update(str(self.scm_matrix).encode("utf-8"))
+        else:
+            res.update(np.ascontiguousarray(self.scm_matrix).tobytes())
 
         # bytes from params
         params_bytes = str([self.bf_size, self.num_hashes, self.offset]).encode("utf-8")
@@ -432,34 +483,28 @@ class Embedder:
         EmbeddedDataFrame
             An embedded data frame with its embedder.
         """
-        df_features = df[colspec.keys()].copy()
-
         # create features from each column
+        features = {}
         for column in colspec:
             column_type = colspec[column]
 
             feature_factory_kw = self.feature_factory[column_type]
             if column_type in self.ff_args:
-                df_features[column] = feature_factory_kw(
-                    df_features[column], **self.ff_args[column_type]
+                features[column + "_features"] = feature_factory_kw(
+                    df[column], **self.ff_args[column_type]
                 )
             else:
-                df_features[column] = feature_factory_kw(df_features[column])
+                features[column + "_features"] = feature_factory_kw(df[column])
 
         # concat the features to a single column
-        df_features.columns = [i + "_features" for i in df_features.columns]
-        df_features["all_features"] = df_features.values.tolist()
-        df_features["all_features"] = df_features["all_features"].apply(
-            lambda x: list(set(it.chain.from_iterable(x)))
-        )
-        df = pd.concat([df, df_features], axis=1)
+        all_features = [list(set(it.chain.from_iterable(row))) for row in zip(*features.values())]
 
         # create bloom filter indices
         bfencoder = BloomFilterEncoder(self.bf_size, self.num_hashes, self.offset, self.salt)
+        bf_indices = bfencoder.bloom_filter_vectors(all_features)
 
-        df["bf_indices"] = df_features["all_features"].apply(
-            lambda x: bfencoder.bloom_filter_vector(x)
-        )
+        # add all the new columns at once
+        df = df.assign(**features, all_features=all_features, bf_indices=bf_indices)
 
         return EmbeddedDataFrame(
             df, embedder=self, update_norms=update_norms, update_thresholds=update_thresholds
@@ -494,6 +539,7 @@ class Embedder:
         SimilarityArray
             An N by M array containing the similarity matrix of pairwise
             Soft Cosine similarities between rows of `edf1` and `edf2`.
+            Similarities are single precision (`numpy.float32`).
 
         Raises
         ------
@@ -510,13 +556,17 @@ class Embedder:
         if "bf_norms" not in edf2.columns:
             edf2.update_norms()
 
-        X1 = edf1.to_bloom_matrix()
-        X2 = edf2.to_bloom_matrix()
-        A = edf1.embedder.scm_matrix
-        diag_norm1 = np.diag(1 / np.array(edf1.bf_norms))
-        diag_norm2 = np.diag(1 / np.array(edf2.bf_norms))
+        # Comparing an EDF with itself needs only one matrix
+        X1 = edf1.to_bloom_matrix(sparse=True)
+        X2 = X1 if edf2 is edf1 else edf2.to_bloom_matrix(sparse=True)
+        inv_norm1 = 1 / np.array(edf1.bf_norms)
+        inv_norm2 = 1 / np.array(edf2.bf_norms)
 
-        res = diag_norm1 @ X1 @ A @ X2.T @ diag_norm2
+        res = _to_dense(X1 @ self._scm_product(X2))
+
+        # Scale the rows and columns rather than multiplying by diagonals
+        res *= inv_norm1[:, None]
+        res *= inv_norm2[None, :]
 
         if "thresholds" in edf1.columns and "thresholds" in edf2.columns:
             thresholds = (edf1["thresholds"].to_numpy(), edf2["thresholds"].to_numpy())
@@ -527,6 +577,19 @@ class Embedder:
 
         return SimilarityArray(res, thresholds=thresholds, embedder_checksum=self.checksum)
 
+    def _scm_product(self, X: csr_matrix) -> np.ndarray | csr_matrix:
+        """Calculate `scm_matrix @ X.T` for a sparse Bloom matrix `X`.
+
+        An untrained SCM matrix is the identity, giving plain cosine
+        similarity, so we skip it and keep the product sparse. Otherwise,
+        we only multiply sparse by dense.
+        """
+        A = self.scm_matrix
+        if np.count_nonzero(A) == len(A) and np.all(np.diagonal(A) == 1):
+            return X.T
+
+        return (X @ A.T).T
+
     def _joint_freq_matrix(
         self,
         bf_indices1: list[list] | pd.Series,
@@ -547,16 +610,27 @@ class Embedder:
         N = len(bf_indices1)
         bfsize = self.bf_size + self.offset
 
-        coordinates = ([], [])
-        # Loop through the cross-product of every index in bf_indices1[n]
-        # and every index in bf_indices2[n]
-        # for n in 1:len(bf_indices1)
-        for i, j in it.chain.from_iterable(map(it.product, bf_indices1, bf_indices2)):
-            coordinates[0].append(i)
-            coordinates[1].append(j)
+        # Flatten the indices, keeping track of where each row starts
+        lengths1 = np.fromiter(map(len, bf_indices1), dtype=np.intp, count=N)
+        lengths2 = np.fromiter(map(len, bf_indices2), dtype=np.intp, count=N)
+        flat1 = np.fromiter(it.chain.from_iterable(bf_indices1), np.intp, lengths1.sum())
+        flat2 = np.fromiter(it.chain.from_iterable(bf_indices2), np.intp, lengths2.sum())
+        starts2 = np.cumsum(lengths2) - lengths2
+
+        # Take the cross-product of every index in bf_indices1[n] and
+        # every index in bf_indices2[n] for n in 1:len(bf_indices1), by
+        # pairing each index in flat1 with the whole of its row in flat2
+        block_lengths = np.repeat(lengths2, lengths1)
+        block_starts = np.repeat(np.repeat(starts2, lengths1), block_lengths)
+        block_offsets = np.arange(block_lengths.sum()) - np.repeat(
+            np.cumsum(block_lengths) - block_lengths, block_lengths
+        )
+        rows = np.repeat(flat1, block_lengths)
+        cols = flat2[block_starts + block_offsets]
 
-        S = np.zeros((bfsize, bfsize), np.float32)
-        np.add.at(S, coordinates, 1.0)
+        # Count each pair via its position in the flattened matrix
+        counts = np.bincount(rows * bfsize + cols, minlength=bfsize * bfsize)
+        S = counts.reshape(bfsize, bfsize).astype(np.float32)
 
         # Make it symmetric
         S = (S + S.T) / 2
@@ -572,7 +646,7 @@ class Embedder:
         update: bool = True,
         learning_rate: float = 1.0,
         eps: float = 0.01,
-        random_state: None | np.random.RandomState = None,
+        random_state: None | int | np.random.RandomState | np.random.Generator = None,
     ) -> None:
         """Fit Soft Cosine Measure matrix to two matched datasets.
 
@@ -602,8 +676,9 @@ class Embedder:
         learning_rate: float
             Scaling factor to dampen matrix updates. Must be in the
             interval `(0, 1]`. Default is 0.01.
-        random_state: RandomState, optional
-            Random state to pass to dataset jumbler. Defaults to `None`.
+        random_state: int, RandomState or Generator, optional
+            Seed or random state to pass to dataset jumbler. Seeds are
+            passed to `numpy.random.default_rng()`. Defaults to `None`.
 
         Attributes
         ----------
@@ -620,7 +695,12 @@ class Embedder:
         assert eps >= 0.0, "Negative eps not allowed"
         assert learning_rate > 0.0 and learning_rate <= 1.0
 
-        y_jumbled = pd.Series(y).sample(frac=1, random_state=random_state).to_list()
+        # Jumble the matches with a random permutation
+        if isinstance(random_state, np.random.RandomState):
+            permutation = random_state.permutation(len(y))
+        else:
+            permutation = np.random.default_rng(random_state).permutation(len(y))
+        y_jumbled = y.iloc[permutation]
 
         # Calculate joint probability matrix for matches
         freq_matr_matched = self._joint_freq_matrix(x, y)
@@ -642,7 +722,7 @@ class Embedder:
         # This also ensures that the diagonal is non-negative
         scm_matrix = nearest_pos_semi_definite(scm_matrix, eps=1e-6)
         self.scm_matrix = scm_matrix
-        self._compute_checksum()
+        self.checksum = self._compute_checksum()
 
     def to_pickle(self, path: None | str = None) -> None | bytes:
         """Save Embedder instance to pickle file.
@@ -687,7 +767,9 @@ class Embedder:
         Returns
         -------
         embedder : Embedder
-            The reformed instance of the `Embedder` class.
+            The reformed instance of the `Embedder` class. Embedders
+            pickled with the legacy checksum have it updated to the
+            current one.
         """
 
         neither = path is None and pickled is None
@@ -702,13 +784,24 @@ class Embedder:
         if isinstance(pickled, (str, bytes)):
             embedder = dill.loads(pickled)
 
+        checksum = embedder._compute_checksum()
+        if embedder.checksum != checksum:
+            legacy_checksum = embedder._compute_checksum(legacy=True)
+            if embedder.checksum == legacy_checksum:
+                embedder.checksum = checksum
+
         assert (
-            embedder.checksum == embedder._compute_checksum()
+            embedder.checksum == checksum
         ), "Checksum on loaded Embedder instance doesn't match saved checksum."
 
         return embedder
 
 
+def _to_dense(X: np.ndarray | spmatrix) -> np.ndarray:
+    """Convert a (possibly sparse) matrix product to a dense array."""
+    return X.toarray() if issparse(X) else X
+
+
 def nearest_pos_semi_definite(X: np.ndarray, eps: float = 0.0) -> np.ndarray:
     """Calculate nearest positive semi-definite version of a matrix.
 
@@ -733,7 +826,8 @@ def nearest_pos_semi_definite(X: np.ndarray, eps: float = 0.0) -> np.ndarray:
         A positive (semi-)definite matrix.
     """
     C = (X + X.T) / 2
-    eigval, eigvec = np.linalg.eig(C)
+    eigval, eigvec = np.linalg.eigh(C)
     eigval[eigval < 0] = eps
 
-    return np.real(eigvec.dot(np.diag(eigval)).dot(eigvec.T))
+    # Scale the columns of eigvec rather than building a diagonal matrix
+    return (eigvec * eigval) @ eigvec.T
@@ -1,11 +1,15 @@
 """Feature generation functions for various column types."""
 
+import functools
 import re
 from typing import Generator, Hashable
 
 import pandas as pd
 from metaphone import doublemetaphone
 
+# Runs of whitespace, plus signs, dashes, underscores, commas and dots
+_SPLIT_PATTERN = re.compile(r"[\s\+\-\_\,\.]+")
+
 
 def split_string_underscore(string: str) -> list[str]:
     """Split and underwrap a string at typical punctuation marks.
@@ -31,7 +35,7 @@ def split_string_underscore(string: str) -> list[str]:
     split: list[str]
         List of the split and wrapped tokens.
     """
-    words = re.split(r"[\s\+\-\_\,\.]+", string)
+    words = _SPLIT_PATTERN.split(string)
     split = [f"_{word}_" for word in words if word]
 
     return split
@@ -95,6 +99,12 @@ def gen_skip_grams(split_tokens: list) -> Generator[str, None, None]:
             yield token[i] + token[i + 2]
 
 
+@functools.lru_cache(maxsize=1 << 17)
+def _cached_double_metaphone(token: str) -> tuple[str, str]:
+    """Get the double metaphone of a token, caching repeated tokens."""
+    return doublemetaphone(token)
+
+
 def gen_double_metaphone(string: str) -> Generator[str, None, None]:
     """Generate the double methaphones of a string.
 
@@ -104,6 +114,9 @@ def gen_double_metaphone(string: str) -> Generator[str, None, None]:
     hood, ignoring any empty strings. See their
     [repository](https://github.com/oubiwann/metaphone) for details.
 
+    Names repeat heavily in most data, so the double metaphone of each
+    token is cached.
+
     Parameters
     ----------
     string: str
@@ -115,7 +128,7 @@ def gen_double_metaphone(string: str) -> Generator[str, None, None]:
         The next double metaphone in the sequence.
     """
     for token in string.split():
-        double_metaphone = doublemetaphone(token)
+        double_metaphone = _cached_double_metaphone(token)
         for metaphone in double_metaphone:
             if metaphone != "":
                 yield metaphone
@@ -173,7 +186,8 @@ def gen_name_features(
     """Generate a features series for a series of names.
 
     Effectively, this function is a call to `pd.Series.apply()` using
-    our `gen_features()` string feature generator function.
+    our `gen_features()` string feature generator function, except
+    that the features of each distinct name are only generated once.
 
     Parameters
     ----------
@@ -193,20 +207,26 @@ def gen_name_features(
     pd.Series
         Series containing lists of features.
     """
-    features = (
-        names.copy()
-        .fillna("")
-        .apply(
-            lambda name: list(
-                gen_features(
-                    name,
-                    ngram_length,
-                    use_gen_ngram,
-                    use_gen_skip_grams,
-                    use_double_metaphone,
-                )
+    # Names repeat heavily, so only generate features for distinct names
+    codes, uniques = pd.factorize(names.fillna(""))
+    unique_features = [
+        list(
+            gen_features(
+                name,
+                ngram_length,
+                use_gen_ngram,
+                use_gen_skip_grams,
+                use_double_metaphone,
             )
         )
+        for name in uniques
+    ]
+
+    features = pd.Series(
+        [list(unique_features[code]) for code in codes],
+        index=names.index,
+        name=names.name,
+        dtype=object,
     )
 
     return features
@@ -231,17 +251,17 @@ def gen_sex_features(sexes: pd.Series) -> pd.Series:
         isinstance(sex, list) for sex in sexes
     ), "Elements of `sexes` should not be lists"
 
-    sexes = (
-        sexes.copy()
+    # There are only a handful of distinct sexes, so label those and gather
+    codes, uniques = pd.factorize(sexes, use_na_sentinel=False)
+    initials = (
+        pd.Series(uniques, dtype=object)
         .str.casefold()  # make everything lowercase
         .str[0]  # take the first character
-        .replace(
-            r"(^.*$)",  # match the whole string (in a group)
-            r"sex<\1>",  # wrap the string in 'sex<>'
-            regex=True,
-        )
-        .fillna("")
-        .apply(lambda sex: [sex])
+    )
+    labels = ("sex<" + initials + ">").fillna("").to_list()  # wrap in 'sex<>'
+
+    sexes = pd.Series(
+        [[labels[code]] for code in codes], index=sexes.index, name=sexes.name, dtype=object
     )
 
     return sexes
@@ -280,11 +300,20 @@ def gen_dateofbirth_features(
     """
     datetimes = pd.to_datetime(dob, errors="coerce", dayfirst=dayfirst, yearfirst=yearfirst)
 
-    features = (
-        datetimes.dt.strftime("day<%d>_month<%m>_year<%Y>")
-        .str.split("_")
-        .fillna("")
-        .apply(lambda date: default if date == "" else date)
+    # Format the date parts directly rather than via `strftime()` and
+    # splitting, using floats since the parts of missing dates are NaN
+    features = pd.Series(
+        [
+            default
+            if missing
+            else [f"day<{day:02.0f}>", f"month<{month:02.0f}>", f"year<{year:.0f}>"]
+            for missing, day, month, year in zip(
+                datetimes.isna(), datetimes.dt.day, datetimes.dt.month, datetimes.dt.year
+            )
+        ],
+        index=datetimes.index,
+        name=datetimes.name,
+        dtype=object,
     )
 
     return features
@@ -311,21 +340,22 @@ def gen_misc_features(field: pd.Series, label: None | str | Hashable = None) ->
         Series containing lists of miscellaneous features.
     """
     label = label or field.name or "misc"
+    missing = field.isna() | (field == "")
 
     _field = (
-        field.copy()
-        .replace("", "no_data", regex=False)
-        .fillna("no_data")
-        .astype("str")
-        .str.casefold()  # make everything lowercase
-        .replace(
-            r"(^.*$)",  # match the whole string in a group
-            rf"{label}<\1>",  # markup the string with label
-            regex=True,
-        )
+        f"{label}<"  # markup the string with label
+        + field.astype("str").str.casefold()  # make everything lowercase
+        + ">"
+    )
+    _field_list = pd.Series(
+        [
+            "" if is_missing else [value]  # missing values disappear later
+            for value, is_missing in zip(_field.to_list(), missing.to_list())
+        ],
+        index=field.index,
+        name=field.name,
+        dtype=object,
     )
-    _field_list = _field.apply(lambda x: [x])
-    _field_list.loc[_field == f"{label}<no_data>"] = ""  # disappears later
 
     return _field_list
 
@@ -340,8 +370,7 @@ def gen_misc_shingled_features(
 
     Generate n-grams, with a label to distinguish them from (and ensure
     they're hashed separately from) names. Like `gen_name_features()`,
-    this function makes a call to `gen_features()` via
-    `pd.Series.apply()`.
+    this function calls `gen_features()` once for each distinct value.
 
     Parameters
     ----------
@@ -362,19 +391,25 @@ def gen_misc_shingled_features(
     """
     label = label or field.name or "zz"
 
-    _field = (
-        field.copy()
-        .fillna("")
-        .apply(
-            lambda string: [
-                f"{label}<{feature}>"
-                for feature in gen_features(
-                    string,
-                    ngram_length=ngram_length,
-                    use_gen_skip_grams=use_gen_skip_grams,
-                )
-            ]
-        )
+    # As in `gen_name_features()`, only generate features for distinct values
+    codes, uniques = pd.factorize(field.fillna(""))
+    unique_features = [
+        [
+            f"{label}<{feature}>"
+            for feature in gen_features(
+                string,
+                ngram_length=ngram_length,
+                use_gen_skip_grams=use_gen_skip_grams,
+            )
+        ]
+        for string in uniques
+    ]
+
+    _field = pd.Series(
+        [list(unique_features[code]) for code in codes],
+        index=field.index,
+        name=field.name,
+        dtype=object,
     )
 
     return _field
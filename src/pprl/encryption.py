@@ -1,13 +1,89 @@
 """Tools for performing envelope encryption on GCP."""
 
+import io
 import json
 
 import pandas as pd
+import pyarrow as pa
 from cryptography.fernet import Fernet
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding
 from google.cloud import kms
+from pyarrow import feather
+
+from pprl.utils import arrow_to_pandas
+
+_FEATHER_MAGIC = b"ARROW1"
+
+
+def _contains_struct(type_: pa.DataType) -> bool:
+    """Determine whether an Arrow type is, or holds, a struct."""
+
+    if pa.types.is_struct(type_):
+        return True
+    if pa.types.is_list(type_) or pa.types.is_large_list(type_):
+        return _contains_struct(type_.value_type)
+
+    return False
+
+
+def _serialise_data(data: pd.DataFrame) -> bytes:
+    """
+    Serialise a data frame to bytes for encryption.
+
+    We use Feather (Arrow IPC), which is much faster and smaller than
+    JSON and keeps the column types. Frames Arrow cannot hold, such as
+    those with mixed-type or complex columns, fall back to JSON. So do
+    frames with dictionaries, since Arrow would turn them into structs
+    and fill in each dictionary's missing keys.
+
+    Parameters
+    ----------
+    data : pd.DataFrame
+        Data frame to serialise.
+
+    Returns
+    -------
+    payload : bytes
+        Serialised data frame.
+    """
+
+    try:
+        table = pa.Table.from_pandas(data)
+    except pa.ArrowException:
+        table = None
+
+    if table is None or any(map(_contains_struct, table.schema.types)):
+        return data.to_json().encode("utf-8")
+
+    buffer = io.BytesIO()
+    feather.write_feather(table, buffer)
+
+    return buffer.getvalue()
+
+
+def _deserialise_data(payload: bytes) -> pd.DataFrame:
+    """
+    Deserialise a data frame from Feather or JSON bytes.
+
+    Parameters
+    ----------
+    payload : bytes
+        Serialised data frame.
+
+    Returns
+    -------
+    data : pd.DataFrame
+        Deserialised data frame.
+    """
+
+    if not payload.startswith(_FEATHER_MAGIC):
+        return pd.DataFrame(json.loads(payload))
+
+    table = feather.read_table(pa.BufferReader(payload))
+
+    return arrow_to_pandas(table)
 
 
 def encrypt_data(data: pd.DataFrame, key: None | bytes = None) -> tuple[bytes, bytes]:
@@ -33,7 +109,7 @@ def encrypt_data(data: pd.DataFrame, key: None | bytes = None) -> tuple[bytes, b
         key = Fernet.generate_key()
 
     fernet = Fernet(key)
-    payload = data.to_json().encode("utf-8")
+    payload = _serialise_data(data)
     encrypted = fernet.encrypt(payload)
 
     return encrypted, key
@@ -58,7 +134,7 @@ def decrypt_data(encrypted: bytes, key: bytes) -> pd.DataFrame:
 
     fernet = Fernet(key)
     decrypted = fernet.decrypt(encrypted)
-    data = pd.DataFrame(json.loads(decrypted))
+    data = _deserialise_data(decrypted)
 
     return data
 
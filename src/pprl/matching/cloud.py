@@ -1,7 +1,11 @@
 """Functions for performing matching in the cloud."""
 
+import functools
 import json
 import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 from google.auth import identity_pool
@@ -11,10 +15,22 @@ from pprl import encryption
 from pprl.embedder.embedder import Embedder
 
 
+@functools.lru_cache(maxsize=1)
+def _get_workload_client() -> storage.Client:
+    """Get the storage client for the workload's own service account."""
+
+    return storage.Client()
+
+
+@functools.lru_cache(maxsize=8)
 def create_impersonation_credentials(party: str, operator: str) -> identity_pool.Credentials:
     """
     Create credentials from an identity pool for impersonating a party.
 
+    Credentials are cached per party and operator, so the attestation
+    file is only downloaded once. The credentials refresh their own
+    access tokens as they expire.
+
     Parameters
     ----------
     party : str
@@ -28,9 +44,9 @@ def create_impersonation_credentials(party: str, operator: str) -> identity_pool
         Credentials created using the party attestation verifier.
     """
 
-    store = storage.Client()
-    bucket = store.get_bucket(f"{operator}-attestation-bucket")
-    string = bucket.get_blob(f"{party}-attestation-credentials.json").download_as_string()
+    store = _get_workload_client()
+    bucket = store.bucket(f"{operator}-attestation-bucket")
+    string = bucket.blob(f"{party}-attestation-credentials.json").download_as_bytes()
     info = json.loads(string)
 
     credentials = identity_pool.Credentials.from_info(
@@ -40,10 +56,116 @@ def create_impersonation_credentials(party: str, operator: str) -> identity_pool
     return credentials
 
 
+@functools.lru_cache(maxsize=8)
+def get_party_client(party: str, operator: str) -> storage.Client:
+    """
+    Get a storage client that impersonates a party.
+
+    Clients are cached per party and operator so that every GCS
+    operation for a party shares one client and its HTTP session.
+
+    Parameters
+    ----------
+    party : str
+        Name of the party to impersonate.
+    operator : str
+        Name of the workload operator.
+
+    Returns
+    -------
+    store : google.cloud.storage.Client
+        GCP storage client using identity pool credentials.
+    """
+
+    credentials = create_impersonation_credentials(party, operator)
+
+    return storage.Client(party, credentials=credentials)
+
+
+_EMBEDDER_CACHE: OrderedDict[str, Embedder] = OrderedDict()
+_EMBEDDER_CACHE_SIZE = 2
+_EMBEDDER_CACHE_LOCK = threading.Lock()
+
+
+def _get_embedder_blob(party: str, operator: str) -> storage.Blob:
+    """
+    Get the embedder pickle blob for a party, along with its metadata.
+
+    Parameters
+    ----------
+    party : str
+        Name of the party.
+    operator : str
+        Name of the workload operator.
+
+    Returns
+    -------
+    blob : google.cloud.storage.Blob
+        Blob for the pickled embedder, including its hashes.
+    """
+
+    logging.info(f"Retrieving embedder metadata for {party}...")
+
+    store = get_party_client(party, operator)
+    bucket = store.bucket(f"{party}-bucket")
+
+    return bucket.get_blob("embedder.pkl")
+
+
+def _load_embedder_blob(blob: storage.Blob) -> Embedder:
+    """
+    Download and unpickle an embedder from its blob.
+
+    Embedders are cached by the MD5 hash that GCS holds for the pickle,
+    so the download and unpickling are skipped for a pickle we have
+    already seen. Like `functools.lru_cache`, only the most recently
+    used embedders are kept. Pickles without an MD5 hash are never
+    cached. The download is pinned to the generation of the blob, so
+    an overwritten pickle is never cached under the old hash.
+
+    Parameters
+    ----------
+    blob : google.cloud.storage.Blob
+        Blob for the pickled embedder.
+
+    Returns
+    -------
+    embedder : Embedder
+        Reformed embedder instance.
+    """
+
+    md5_hash = blob.md5_hash
+    with _EMBEDDER_CACHE_LOCK:
+        if md5_hash is not None and md5_hash in _EMBEDDER_CACHE:
+            _EMBEDDER_CACHE.move_to_end(md5_hash)
+            return _EMBEDDER_CACHE[md5_hash]
+
+    pickled = blob.download_as_bytes(if_generation_match=blob.generation)
+
+    logging.info("Creating embedder from pickle...")
+    embedder = Embedder.from_pickle(pickled=pickled)
+
+    # Composite objects have no MD5 hash, so they cannot be cached
+    if md5_hash is not None:
+        with _EMBEDDER_CACHE_LOCK:
+            _EMBEDDER_CACHE[md5_hash] = embedder
+            if len(_EMBEDDER_CACHE) > _EMBEDDER_CACHE_SIZE:
+                _EMBEDDER_CACHE.popitem(last=False)
+
+    return embedder
+
+
 def download_embedder(parties: list[str], operator: str) -> Embedder:
     """
     Download and initiate the embedder from those on GCP.
 
+    We first compare the MD5 hashes GCS holds for each party's pickle.
+    If they agree, the pickles are identical and only one is
+    downloaded. Otherwise, or if either pickle has no MD5 hash (as
+    with composite objects), every embedder is downloaded and their
+    checksums compared. Requests for each party are made concurrently
+    since they are bound by GCS latency rather than compute.
+
     Parameters
     ----------
     parties : list[str]
@@ -57,22 +179,20 @@ def download_embedder(parties: list[str], operator: str) -> Embedder:
         Reformed embedder instance.
     """
 
-    embedders = []
-    for party in parties:
-        logging.info(f"Retrieving embedder pickle for {party}...")
+    with ThreadPoolExecutor(max_workers=len(parties)) as executor:
+        blobs = list(executor.map(_get_embedder_blob, parties, [operator] * len(parties)))
 
-        credentials = create_impersonation_credentials(party, operator)
+        logging.info("Comparing the embedder pickles...")
+        md5_hashes = {blob.md5_hash for blob in blobs}
+        if len(md5_hashes) == 1 and None not in md5_hashes:
+            embedder = _load_embedder_blob(blobs[0])
+            logging.info("Embedder recreated.")
 
-        store = storage.Client(party, credentials=credentials)
-        bucket = store.get_bucket(f"{party}-bucket")
-        pickled = bucket.get_blob("embedder.pkl").download_as_string()
+            return embedder
 
-        logging.info("Creating embedder from pickle...")
-        embedder = Embedder.from_pickle(pickled=pickled)
+        embedders = list(executor.map(_load_embedder_blob, blobs))
 
-        embedders.append(embedder)
-
-        logging.info("Embedder recreated.")
+    logging.info("Embedders recreated.")
 
     logging.info("Comparing the embedders...")
     embedder, embedder_2 = embedders
@@ -86,6 +206,9 @@ def download_party_assets(store: storage.Client, party: str) -> tuple[bytes, byt
     """
     Download the encrypted data and DEK for a party from GCP.
 
+    Both blobs are downloaded at once using thread workers, since the
+    requests are bound by GCS latency rather than compute.
+
     Parameters
     ----------
     store : google.cloud.storage.Client
@@ -101,13 +224,40 @@ def download_party_assets(store: storage.Client, party: str) -> tuple[bytes, byt
         Encrypted data encryption key (used to encrypt the data).
     """
 
-    bucket = store.get_bucket(f"{party}-bucket")
-    data_encrypted = bucket.get_blob("encrypted_data").download_as_string()
-    dek_encrypted = bucket.get_blob("encrypted_dek").download_as_string()
+    bucket = store.bucket(f"{party}-bucket")
+    names = ("encrypted_data", "encrypted_dek")
+
+    with ThreadPoolExecutor(max_workers=len(names)) as executor:
+        data_encrypted, dek_encrypted = executor.map(
+            _download_encrypted_blob, [bucket] * len(names), names
+        )
 
     return data_encrypted, dek_encrypted
 
 
+def _download_encrypted_blob(bucket: storage.Bucket, name: str) -> bytes:
+    """
+    Download an encrypted blob from a bucket.
+
+    Ciphertext is authenticated on decryption and never stored with a
+    content encoding, so we skip transcoding and client-side checksums.
+
+    Parameters
+    ----------
+    bucket : google.cloud.storage.Bucket
+        Bucket holding the blob.
+    name : str
+        Name of the blob.
+
+    Returns
+    -------
+    encrypted : bytes
+        Contents of the blob.
+    """
+
+    return bucket.blob(name).download_as_bytes(raw_download=True, checksum=None)
+
+
 def prepare_party_assets(
     party: str, operator: str, location: str, version: int | str
 ) -> tuple[pd.DataFrame, bytes]:
@@ -116,7 +266,8 @@ def prepare_party_assets(
 
     To enable these steps, we must first impersonate the party service
     account via the workload identity pool we created during project
-    set-up.
+    set-up. The encrypted data are downloaded while the DEK is being
+    decrypted by KMS.
 
     Parameters
     ----------
@@ -139,13 +290,21 @@ def prepare_party_assets(
     """
 
     credentials = create_impersonation_credentials(party, operator)
-    store = storage.Client(party, credentials=credentials)
+    store = get_party_client(party, operator)
+    bucket = store.bucket(f"{party}-bucket")
 
+    # Download the data in the background while the DEK goes through KMS
     logging.info(f"Loading assets for {party}...")
-    data_encrypted, dek_encrypted = download_party_assets(store, party)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        data_future = executor.submit(_download_encrypted_blob, bucket, "encrypted_data")
+        dek_encrypted = _download_encrypted_blob(bucket, "encrypted_dek")
 
-    logging.info(f"Decrypting DEK for {party}...")
-    dek = encryption.decrypt_dek(dek_encrypted, party, location, version, credentials=credentials)
+        logging.info(f"Decrypting DEK for {party}...")
+        dek = encryption.decrypt_dek(
+            dek_encrypted, party, location, version, credentials=credentials
+        )
+
+        data_encrypted = data_future.result()
 
     logging.info(f"Decrypting data for {party}...")
     data = encryption.decrypt_data(data_encrypted, dek)
@@ -175,9 +334,8 @@ def upload_party_results(output: pd.DataFrame, dek: bytes, party: str, operator:
     logging.info(f"Encrypting results for {party}...")
     encrypted, _ = encryption.encrypt_data(output, dek)
 
-    credentials = create_impersonation_credentials(party, operator)
-    store = storage.Client(credentials=credentials)
-    bucket = store.get_bucket(f"{party}-bucket")
+    store = get_party_client(party, operator)
+    bucket = store.bucket(f"{party}-bucket")
 
     logging.info(f"Uploading encrypted results for {party}...")
     bucket.blob("encrypted_output").upload_from_string(encrypted)
@@ -1,15 +1,23 @@
 """Functions for performing matching locally."""
 
+import functools
 import os
 
+import pandas as pd
+from pyarrow import parquet
+
 from pprl import config
 from pprl.embedder.embedder import Embedder
+from pprl.utils import arrow_to_pandas
 
 
 def build_local_file_paths(party: str) -> tuple[str, str]:
     """
     Construct the paths for the input and output datasets for a party.
 
+    Data are stored as Parquet files. If there is no Parquet input for
+    the party but there is a JSON one, the JSON file is used instead.
+
     Parameters
     ----------
     party : str
@@ -24,16 +32,88 @@ def build_local_file_paths(party: str) -> tuple[str, str]:
     """
 
     stem = config.DIR_DATA_INTERIM
-    inpath = os.path.join(stem, f"{party}-data.json")
-    outpath = os.path.join(stem, f"{party}-output.json")
+    inpath = os.path.join(stem, f"{party}-data.parquet")
+    outpath = os.path.join(stem, f"{party}-output.parquet")
+
+    inpath_json = os.path.join(stem, f"{party}-data.json")
+    if not os.path.exists(inpath) and os.path.exists(inpath_json):
+        inpath = inpath_json
 
     return inpath, outpath
 
 
+def read_local_data(path: str) -> pd.DataFrame:
+    """
+    Read a party dataset from a Parquet or JSON file.
+
+    Parameters
+    ----------
+    path : str
+        Location of the data. Files ending in `.json` are read as JSON,
+        and everything else as Parquet. List columns, such as
+        `bf_indices`, are read as lists either way.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Party data frame.
+    """
+
+    if path.endswith(".json"):
+        return pd.read_json(path)
+
+    return arrow_to_pandas(parquet.read_table(path))
+
+
+def write_local_data(data: pd.DataFrame, path: str) -> None:
+    """
+    Write a party dataset to a Parquet or JSON file.
+
+    Parameters
+    ----------
+    data : pandas.DataFrame
+        Data frame to write.
+    path : str
+        Location to write to. Files ending in `.json` are written as
+        JSON, and everything else as Parquet.
+    """
+
+    if path.endswith(".json"):
+        data.to_json(path)
+    else:
+        data.to_parquet(path, engine="pyarrow", compression="zstd")
+
+
+@functools.lru_cache(maxsize=1)
+def _read_embedder(path: str, mtime: float) -> Embedder:
+    """
+    Unpickle an embedder, caching on its path and modified time.
+
+    Parameters
+    ----------
+    path : str
+        Location of the embedder pickle.
+    mtime : float
+        Last modification time of the pickle. Only used to invalidate
+        the cache when the file changes.
+
+    Returns
+    -------
+    embedder : Embedder
+        Reformed embedder instance.
+    """
+
+    return Embedder.from_pickle(path=path)
+
+
 def load_embedder() -> Embedder:
     """
     Load an embedder from a pickle in the local data directory.
 
+    The embedder is cached against the path and modification time of
+    the pickle, so it is only unpickled again when the file changes.
+    Only the latest embedder is kept in memory.
+
     Returns
     -------
     embedder : Embedder
@@ -41,6 +121,6 @@ def load_embedder() -> Embedder:
     """
 
     path = os.path.join(config.DIR_DATA_INTERIM, "embedder.pkl")
-    embedder = Embedder.from_pickle(path=path)
+    embedder = _read_embedder(path, os.path.getmtime(path))
 
     return embedder
@@ -54,29 +54,33 @@ def add_private_index(
     # Generate a private matching index
     inner_join_size = len(match[0])
     outer_join_size = len(df1) + len(df2) - inner_join_size
+    assert (
+        outer_join_size <= 2 * size_assumed
+    ), "size_assumed is too small for the combined size of the datasets"
     rng = np.random.default_rng(secrets.randbits(128))
-    # Sampling from a fixed range to avoid information leakage
-    private_index = rng.permutation(range(size_assumed, 3 * size_assumed))[:outer_join_size]
+    # Sampling from a fixed range to avoid information leakage, without
+    # shuffling the whole range just to take the first few values
+    private_index = rng.choice(2 * size_assumed, size=outer_join_size, replace=False)
+    private_index += size_assumed
 
-    # Assign the private_index to both datasets
-    # Initialise as zero
-    out1 = df1.copy()
-    out2 = df2.copy()
-    out1[colname] = 0
-    out2[colname] = 0
+    # Build the private index for each dataset as an array
+    rows1 = np.asarray(match[0], dtype=np.intp)
+    rows2 = np.asarray(match[1], dtype=np.intp)
+    index1 = np.zeros(len(df1), dtype=np.int64)
+    index2 = np.zeros(len(df2), dtype=np.int64)
 
     # Assign the inner join first
-    out1.iloc[list(match[0]), out1.columns.get_loc(colname)] = private_index[:inner_join_size]
-    out2.iloc[list(match[1]), out2.columns.get_loc(colname)] = private_index[:inner_join_size]
+    index1[rows1] = private_index[:inner_join_size]
+    index2[rows2] = private_index[:inner_join_size]
 
     # Then assign the left and right remainders
-    data1_size = len(out1)
-    out1.iloc[out1[colname] == 0, out1.columns.get_loc(colname)] = private_index[
-        inner_join_size:data1_size
-    ]
-    out2.iloc[out2[colname] == 0, out2.columns.get_loc(colname)] = private_index[
-        data1_size:outer_join_size
-    ]
+    data1_size = len(df1)
+    index1[index1 == 0] = private_index[inner_join_size:data1_size]
+    index2[index2 == 0] = private_index[data1_size:outer_join_size]
+
+    # Add the index columns without modifying the inputs
+    out1 = df1.assign(**{colname: index1})
+    out2 = df2.assign(**{colname: index2})
 
     return out1, out2
 
@@ -99,9 +103,9 @@ def calculate_performance(
         Tuple of indices of matched pairs between the data frames.
     """
 
-    data_1_sorted = data_1.iloc[list(match[0]), :]
-    data_2_sorted = data_2.iloc[list(match[1]), :]
-    tps = sum(map(np.equal, data_1_sorted["true_id"], data_2_sorted["true_id"]))
+    true_ids_1 = data_1["true_id"].take(np.asarray(match[0], dtype=np.intp)).to_numpy()
+    true_ids_2 = data_2["true_id"].take(np.asarray(match[1], dtype=np.intp)).to_numpy()
+    tps = int(np.equal(true_ids_1, true_ids_2).sum())
     fps = len(match[0]) - tps
 
     logging.info(f"True positives {tps}; false positives {fps}")
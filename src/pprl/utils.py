@@ -0,0 +1,37 @@
+"""Utility functions shared across the pprl package."""
+
+import pandas as pd
+import pyarrow as pa
+
+
+def arrow_to_pandas(table: pa.Table) -> pd.DataFrame:
+    """
+    Convert an Arrow table to a data frame, keeping list columns as lists.
+
+    Arrow gives list columns (such as `bf_indices`) back as NumPy
+    arrays, whether they are stored as lists, large lists or
+    fixed-size lists. We convert these back into the lists the rest of
+    the package expects.
+
+    Parameters
+    ----------
+    table : pyarrow.Table
+        Table to convert.
+
+    Returns
+    -------
+    data : pandas.DataFrame
+        Converted data frame.
+    """
+
+    data = table.to_pandas()
+
+    for name, column in zip(table.column_names, table.columns):
+        t = column.type
+        is_list = (
+            pa.types.is_list(t) or pa.types.is_large_list(t) or pa.types.is_fixed_size_list(t)
+        )
+        if is_list and name in data.columns:
+            data[name] = data[name].map(lambda array: array.tolist(), na_action="ignore")
+
+    return data
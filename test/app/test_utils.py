@@ -1,9 +1,14 @@
 """Unit tests for the Flask app utility functions."""
 
+import io
+import zipfile
+
 import pandas as pd
 import pytest
 
-from pprl.app import utils
+from pprl import Embedder
+from pprl.app import app, utils
+from pprl.embedder import features as feat
 
 
 @pytest.mark.parametrize(
@@ -120,3 +125,25 @@ def test_convert_dataframe_to_bf_other_columns_none():
     assert isinstance(output_dataframe, pd.DataFrame)
     assert len(output_dataframe) == 3
     assert set(output_dataframe.columns) == set(["bf_indices", "bf_norms", "thresholds"])
+
+
+@pytest.mark.parametrize(
+    "feature_factory",
+    [dict(name=feat.gen_name_features), dict(name=lambda names: names)],
+)
+def test_download_files(feature_factory):
+    """Check the archive holds the data and an embedder we can reload."""
+
+    dataframe = pd.DataFrame(dict(column=["a", "b"]))
+    embedder = Embedder(feature_factory=feature_factory)
+
+    with app.test_request_context():
+        response = utils.download_files(dataframe, embedder, "party")
+        response.direct_passthrough = False
+        archive = zipfile.ZipFile(io.BytesIO(response.get_data()))
+
+    assert archive.namelist() == ["data.csv", "embedder.pkl"]
+    assert pd.read_csv(archive.open("data.csv")).equals(dataframe)
+
+    reloaded = Embedder.from_pickle(pickled=archive.read("embedder.pkl"))
+    assert reloaded.checksum == embedder.checksum
@@ -1,6 +1,5 @@
 """Hypothesis strategies for our embedder subpackage tests."""
 
-import re
 import string
 from datetime import datetime
 
@@ -57,7 +56,7 @@ def st_tokenized_names(draw, names=NAMES):
     """Generate a properly tokenized name."""
 
     name = draw(st.sampled_from(names))
-    tokens = [f"_{word}_" for word in re.split(r"[\s-]", name)]
+    tokens = [f"_{word}_" for word in name.replace("-", " ").split()]
 
     return tokens
 
@@ -141,9 +140,9 @@ def st_posdef_matrices(draw, bf_size=10):
     rng = np.random.default_rng(rseed)
     H = rng.normal(scale=2, size=(bf_size, bf_size))
     diag_values = rng.exponential(size=bf_size)
-    Q, _ = qr(H)
+    Q, _ = qr(H, overwrite_a=True, mode="economic", check_finite=False)
 
-    return Q.T @ np.diag(diag_values) @ Q
+    return Q.T @ (diag_values[:, None] * Q)
 
 
 @st.composite
@@ -1,5 +1,6 @@
 """Unit tests for the bloom_filters module."""
 
+import pytest
 from hypothesis import given
 from hypothesis import strategies as st
 
@@ -28,3 +29,52 @@ def test_bloom_filter_vector_collision_fraction(feature, size, num_hashes, offse
 
     assert collision_fraction <= 1
     assert collision_fraction >= 0
+
+
+def test_bloom_filter_vector_collision_fraction_empty():
+    """Check an empty feature has no indices and no collisions."""
+    bfencoder = BloomFilterEncoder()
+
+    assert bfencoder.bloom_filter_vector_collision_fraction([]) == ([], 0.0)
+
+
+@pytest.mark.parametrize(
+    "kwargs,feature,expected",
+    [
+        ({}, ["a", "b", "c"], [18, 192, 334, 381, 720, 1013]),
+        (
+            dict(size=1000, num_hashes=3, offset=5, salt="pepper"),
+            ["_d", "da", 1, 2.5, "é"],
+            [72, 235, 295, 327, 420, 475, 485, 660, 697, 788, 820, 833, 908, 931, 996],
+        ),
+        (
+            dict(size=64, num_hashes=4, salt="s"),
+            ["ab", "bc", "cd"],
+            [9, 10, 33, 38, 40, 49, 51, 53, 56, 57, 58, 63],
+        ),
+    ],
+)
+def test_bloom_filter_vector_examples(kwargs, feature, expected):
+    """Check the encoder produces the same indices for known inputs.
+
+    Bloom filter indices must be stable across versions so that data
+    embedded by each party can be compared.
+    """
+    bfencoder = BloomFilterEncoder(**kwargs)
+
+    assert sorted(bfencoder.bloom_filter_vector(feature)) == expected
+
+
+@given(
+    st.lists(st.lists(st.text(min_size=1) | st.integers(), max_size=10), max_size=10),
+    st.integers(min_value=1, max_value=5),
+    st.text(),
+)
+def test_bloom_filter_vectors(features, num_hashes, salt):
+    """Check batch encoding matches encoding each feature separately."""
+    bfencoder = BloomFilterEncoder(num_hashes=num_hashes, salt=salt)
+    vectors = bfencoder.bloom_filter_vectors(features)
+
+    assert len(vectors) == len(features)
+    for vector, feature in zip(vectors, features):
+        assert sorted(vector) == sorted(bfencoder.bloom_filter_vector(feature))
@@ -1,15 +1,20 @@
 """Unit tests for the embedder module."""
 
+import itertools
 import unittest.mock as mock
 
 import numpy as np
 import pandas as pd
+import pytest
 from hypothesis import HealthCheck, given, settings
+from hypothesis import strategies as st
+from scipy.optimize import linear_sum_assignment
 
 from pprl import EmbeddedDataFrame, Embedder
 from pprl.embedder import features as feat
+from pprl.embedder.embedder import SimilarityArray, nearest_pos_semi_definite
 
-from .strategies import st_matrix_and_indices, st_posdef_matrices
+from .strategies import st_bf_indices, st_matrix_and_indices, st_posdef_matrices
 
 
 def alt_calculate_norm(scm_matrix, bf_indices):
@@ -75,6 +80,31 @@ def test_update_norms(posdef_matrix):
     assert bf_norms1 == bf_norms2
 
 
+@given(st.lists(st_bf_indices(bf_size=20), max_size=10), st.integers(0, 5))
+def test_to_bloom_matrix(bf_indices, offset):
+    """Test EmbeddedDataFrame.to_bloom_matrix.
+
+    Tests the following properties: shape, each row is the binary
+    vector of its Bloom filter indices.
+    """
+    df = pd.DataFrame(dict(bf_indices=bf_indices), dtype=object)
+    embedder_mock = mock.Mock(Embedder)
+    embedder_mock.bf_size = 20 - offset
+    embedder_mock.offset = offset
+    embedder_mock.checksum = "1234"
+    edf = EmbeddedDataFrame(df, embedder_mock, update_norms=False)
+
+    X = edf.to_bloom_matrix()
+
+    assert X.shape == (len(bf_indices), 20)
+    for row, indices in zip(X, bf_indices):
+        expected = np.zeros(20)
+        expected[indices] = 1.0
+        np.testing.assert_array_equal(row, expected)
+
+    np.testing.assert_array_equal(edf.to_bloom_matrix(sparse=True).toarray(), X)
+
+
 def test_anonymise():
     """Tests EmbeddedDataFrame.anonymise.
 
@@ -218,6 +248,107 @@ def test_embed_all_features():
     assert ground_truth == set(embed_df["all_features"][0])
 
 
+def test_compare_untrained_is_cosine():
+    """Check an untrained embedder gives cosine similarities."""
+    df1 = pd.DataFrame(dict(name=["Bob", "Sally", "Samina"]))
+    df2 = pd.DataFrame(dict(name=["Rob", "Saly"]))
+    colspec = dict(name="name")
+
+    embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+    edf1 = embedder.embed(df1, colspec)
+    edf2 = embedder.embed(df2, colspec)
+
+    X1, X2 = edf1.to_bloom_matrix(), edf2.to_bloom_matrix()
+    expected = (X1 @ X2.T) / np.outer(np.linalg.norm(X1, axis=1), np.linalg.norm(X2, axis=1))
+
+    result = embedder.compare(edf1, edf2, require_thresholds=False)
+
+    np.testing.assert_allclose(result, expected)
+
+
+def test_update_thresholds():
+    """Check thresholds are each row's best score against the others."""
+    df = pd.DataFrame(dict(name=["Bob", "Rob", "Sally", "Saly", "Samina"]))
+    colspec = dict(name="name")
+
+    embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+    embedder.train(embedder.embed(df, colspec), embedder.embed(df, colspec))
+    edf = embedder.embed(df, colspec, update_thresholds=True)
+
+    similarities = np.asarray(embedder.compare(edf, edf, require_thresholds=False))
+    np.fill_diagonal(similarities, -np.inf)
+
+    assert similarities.dtype == np.float32
+    assert edf["thresholds"].dtype == np.float32
+    np.testing.assert_allclose(edf["thresholds"], similarities.max(axis=1))
+
+
+def test_train_updates_checksum():
+    """Check training changes the checksum and survives a pickle."""
+    df1 = pd.DataFrame(dict(name=["Bob", "Sally", "Samina", "John"]))
+    df2 = pd.DataFrame(dict(name=["Rob", "Saly", "Samia", "Jon"]))
+    colspec = dict(name="name")
+
+    embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+    checksum = embedder.checksum
+    embedder.train(embedder.embed(df1, colspec), embedder.embed(df2, colspec))
+
+    assert embedder.checksum != checksum
+    assert embedder.checksum == embedder._compute_checksum()
+    assert Embedder.from_pickle(pickled=embedder.to_pickle()).checksum == embedder.checksum
+
+
+@pytest.mark.parametrize(
+    "make_random_state",
+    [lambda: 42, lambda: np.random.RandomState(42), lambda: np.random.default_rng(42)],
+)
+def test_train_random_state(make_random_state):
+    """Check training is reproducible with a seed or seeded random state."""
+    df1 = pd.DataFrame(dict(name=["Bob", "Sally", "Samina", "John"]))
+    df2 = pd.DataFrame(dict(name=["Rob", "Saly", "Samia", "Jon"]))
+    colspec = dict(name="name")
+
+    embedders = []
+    for _ in range(2):
+        embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+        edf1, edf2 = embedder.embed(df1, colspec), embedder.embed(df2, colspec)
+        embedder.train(edf1, edf2, random_state=make_random_state())
+        embedders.append(embedder)
+
+    assert embedders[0].checksum == embedders[1].checksum
+
+    # The non-matches should be jumbled by the seeded permutation
+    random_state = make_random_state()
+    if isinstance(random_state, np.random.RandomState):
+        permutation = random_state.permutation(len(edf2))
+    else:
+        permutation = np.random.default_rng(random_state).permutation(len(edf2))
+    y_jumbled = edf2.bf_indices.iloc[permutation]
+    expected = embedder._initmatrix() + embedder._joint_freq_matrix(edf1.bf_indices, y_jumbled)
+    assert np.array_equal(embedders[0].freq_matr_unmatched, expected)
+
+
+def test_from_pickle_legacy_checksum():
+    """Check embedders pickled with the legacy checksum still load."""
+    embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+    checksum = embedder.checksum
+    embedder.checksum = embedder._compute_checksum(legacy=True)
+    assert embedder.checksum != checksum
+
+    loaded = Embedder.from_pickle(pickled=embedder.to_pickle())
+
+    assert loaded.checksum == checksum
+
+
+def test_from_pickle_bad_checksum():
+    """Check embedders with a checksum in neither format do not load."""
+    embedder = Embedder(feature_factory=dict(name=feat.gen_name_features), bf_size=64)
+    embedder.checksum = "not-a-checksum"
+
+    with pytest.raises(AssertionError, match="Checksum"):
+        Embedder.from_pickle(pickled=embedder.to_pickle())
+
+
 def test_SimilarityArray_match():
     """Test for expected output with small dataset and no iteration."""
     df1 = pd.DataFrame(dict(name=["Bob", "Sally", "Samina", "John"]))
@@ -244,3 +375,91 @@ def test_SimilarityArray_match():
     )
 
     np.testing.assert_equal(matching, ground_truth)
+
+
+def alt_match(S, thresholds, abs_cutoff, rel_cutoff, hungarian):
+    """Compute a matching from a masked similarity array.
+
+    An alternative method, used in testing.
+    """
+    S = np.ma.array(S.copy())
+    S[S < thresholds[0][:, None] + rel_cutoff] = np.ma.masked
+    S[S < thresholds[1] + rel_cutoff] = np.ma.masked
+    S[S < abs_cutoff] = np.ma.masked
+
+    if hungarian:
+        row, col = linear_sum_assignment(S.data, maximize=True)
+        keep = ~S.mask[row, col]
+        return row[keep], col[keep]
+
+    return np.ma.where(S >= abs_cutoff)
+
+
+@given(
+    st.integers(1, 10),
+    st.integers(1, 10),
+    st.integers(0, 2**14),
+    st.floats(0, 1),
+    st.floats(-0.5, 0.5),
+    st.booleans(),
+)
+def test_SimilarityArray_match_masking(nrows, ncols, seed, abs_cutoff, rel_cutoff, hungarian):
+    """Check matching agrees with masking out pairs below the thresholds."""
+    rng = np.random.default_rng(seed)
+    scores = rng.random((nrows, ncols))
+    thresholds = (rng.random(nrows), rng.random(ncols))
+    S = SimilarityArray(scores, thresholds=thresholds)
+
+    matching = S.match(abs_cutoff=abs_cutoff, rel_cutoff=rel_cutoff, hungarian=hungarian)
+    expected = alt_match(scores, thresholds, abs_cutoff, rel_cutoff, hungarian)
+
+    np.testing.assert_equal(matching, expected)
+
+
+def alt_joint_freq_matrix(bf_indices1, bf_indices2, bfsize):
+    """Count index pairs across rows by looping over their products.
+
+    An alternative method, used in testing.
+    """
+    S = np.zeros((bfsize, bfsize))
+    for indices1, indices2 in zip(bf_indices1, bf_indices2):
+        for i, j in itertools.product(indices1, indices2):
+            S[i, j] += 1.0
+
+    return (S + S.T) / 2
+
+
+@given(
+    st.integers(0, 10).flatmap(
+        lambda n: st.tuples(
+            st.lists(st_bf_indices(bf_size=20), min_size=n, max_size=n),
+            st.lists(st_bf_indices(bf_size=20), min_size=n, max_size=n),
+        )
+    )
+)
+def test_joint_freq_matrix(bf_indices):
+    """Test Embedder._joint_freq_matrix against looping over each row."""
+    bf_indices1, bf_indices2 = bf_indices
+    embedder = Embedder(feature_factory={}, bf_size=20)
+
+    result = embedder._joint_freq_matrix(bf_indices1, bf_indices2)
+    expected = alt_joint_freq_matrix(bf_indices1, bf_indices2, 20)
+
+    np.testing.assert_array_equal(result, expected)
+
+
+@given(st_posdef_matrices(bf_size=10), st.integers(0, 2**14))
+def test_nearest_pos_semi_definite(posdef_matrix, seed):
+    """Test nearest_pos_semi_definite.
+
+    Tests the following properties: symmetric, positive semi-definite,
+    leaves a positive definite matrix unchanged.
+    """
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=posdef_matrix.shape)
+
+    result = nearest_pos_semi_definite(X)
+
+    assert np.allclose(result, result.T)
+    assert np.all(np.linalg.eigvalsh(result) >= -1e-8)
+    assert np.allclose(nearest_pos_semi_definite(posdef_matrix), posdef_matrix)
@@ -263,8 +263,9 @@ def test_gen_name_features(names, lengths, ngram, skip2gram, double_metaphone):
     assert isinstance(name_features, pd.Series)
     assert name_features.to_list() == [["foo"]] * len(names)
 
-    assert gen_features.call_count == len(names)
-    gen_features.assert_called_with(names.iloc[-1], lengths, ngram, skip2gram, double_metaphone)
+    uniques = names.fillna("").unique()
+    assert gen_features.call_count == len(uniques)
+    gen_features.assert_called_with(uniques[-1], lengths, ngram, skip2gram, double_metaphone)
 
 
 def test_gen_name_features_examples():
@@ -449,6 +450,11 @@ def test_gen_misc_features(fields, label):
             pd.Series([["bar<1>"], ["bar<2>"], ["bar<['a', 1]>"], ""]),
             "bar",
         ),
+        (
+            pd.Series(["no_data", "NO_DATA", ""]),
+            pd.Series([["baz<no_data>"], ["baz<no_data>"], ""]),
+            "baz",
+        ),
     ],
 )
 def test_gen_misc_features_examples(test_input, expected, label):
@@ -458,6 +464,18 @@ def test_gen_misc_features_examples(test_input, expected, label):
     assert (misc_features).equals(expected)
 
 
+def test_gen_misc_features_keeps_index_and_name():
+    """Check misc features match wrapping each labelled value in a list."""
+    field = pd.Series(["A", None, "b", ""], index=[3, 1, 4, 1], name="colour")
+
+    misc_features = feat.gen_misc_features(field)
+
+    expected = pd.Series(
+        [["colour<a>"], "", ["colour<b>"], ""], index=[3, 1, 4, 1], name="colour", dtype=object
+    )
+    pd.testing.assert_series_equal(misc_features, expected)
+
+
 @given(
     st_strings_series(),
     st.lists(st.integers(1, 3), min_size=1, max_size=2, unique=True),
@@ -477,10 +495,10 @@ def test_gen_misc_shingled_features(fields, lengths, skip2grams, label):
 
     assert features.to_list() == [[f"{label}<foo>"]] * nrows
 
-    assert gen_features.call_count == nrows
-    last_field = fields.iloc[-1] or ""
+    uniques = fields.fillna("").unique()
+    assert gen_features.call_count == len(uniques)
     gen_features.assert_called_with(
-        last_field, ngram_length=lengths, use_gen_skip_grams=skip2grams
+        uniques[-1], ngram_length=lengths, use_gen_skip_grams=skip2grams
     )
 
 
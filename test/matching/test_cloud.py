@@ -0,0 +1,73 @@
+"""Unit tests for the cloud matching module."""
+
+import unittest.mock as mock
+
+import pytest
+
+from pprl.matching import cloud
+
+
+@pytest.fixture(autouse=True)
+def empty_embedder_cache():
+    """Start and finish each test with an empty embedder cache."""
+
+    cloud._EMBEDDER_CACHE.clear()
+    yield
+    cloud._EMBEDDER_CACHE.clear()
+
+
+def make_blob(md5_hash, generation):
+    """Make a mock embedder blob with the given hash and generation."""
+
+    blob = mock.Mock(md5_hash=md5_hash, generation=generation)
+    blob.download_as_bytes.return_value = f"pickle-{generation}".encode()
+
+    return blob
+
+
+def test_load_embedder_blob_pins_generation():
+    """Check the pickle is downloaded from the blob's own generation."""
+
+    blob = make_blob("hash", 1)
+
+    with mock.patch("pprl.matching.cloud.Embedder.from_pickle") as from_pickle:
+        embedder = cloud._load_embedder_blob(blob)
+
+    blob.download_as_bytes.assert_called_once_with(if_generation_match=1)
+    from_pickle.assert_called_once_with(pickled=b"pickle-1")
+    assert embedder is from_pickle.return_value
+
+
+def test_load_embedder_blob_cache():
+    """Check a seen hash is served from the cache and a new one reloads."""
+
+    first, same, changed = make_blob("hash", 1), make_blob("hash", 1), make_blob("new", 2)
+
+    with mock.patch("pprl.matching.cloud.Embedder.from_pickle") as from_pickle:
+        from_pickle.side_effect = lambda pickled: mock.Mock(name=pickled.decode())
+        embedder = cloud._load_embedder_blob(first)
+        cached = cloud._load_embedder_blob(same)
+        reloaded = cloud._load_embedder_blob(changed)
+
+    assert cached is embedder
+    same.download_as_bytes.assert_not_called()
+    assert reloaded is not embedder
+    changed.download_as_bytes.assert_called_once_with(if_generation_match=2)
+
+
+def test_load_embedder_blob_cache_evicts_oldest():
+    """Check the least recently used embedder is evicted and reloaded."""
+
+    blobs = [make_blob(f"hash-{i}", i) for i in range(cloud._EMBEDDER_CACHE_SIZE + 1)]
+
+    with mock.patch("pprl.matching.cloud.Embedder.from_pickle"):
+        for blob in blobs:
+            cloud._load_embedder_blob(blob)
+
+        assert list(cloud._EMBEDDER_CACHE) == [blob.md5_hash for blob in blobs[1:]]
+
+        oldest = make_blob("hash-0", 0)
+        cloud._load_embedder_blob(oldest)
+
+    oldest.download_as_bytes.assert_called_once_with(if_generation_match=0)
+    assert "hash-1" not in cloud._EMBEDDER_CACHE
@@ -0,0 +1,21 @@
+"""Unit tests for the local matching module."""
+
+import pandas as pd
+import pytest
+
+from pprl.matching import local
+
+
+@pytest.mark.parametrize("extension", ["parquet", "json"])
+def test_read_write_local_data(tmp_path, extension):
+    """Check a data frame survives a round trip in either format."""
+
+    data = pd.DataFrame(dict(name=["a", "b"], bf_indices=[[1, 2], [3]]))
+    path = str(tmp_path / f"party-data.{extension}")
+
+    local.write_local_data(data, path)
+    result = local.read_local_data(path)
+
+    assert result["name"].to_list() == ["a", "b"]
+    assert result["bf_indices"].to_list() == [[1, 2], [3]]
+    assert all(isinstance(indices, list) for indices in result["bf_indices"])
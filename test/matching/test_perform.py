@@ -43,3 +43,22 @@ def test_add_private_index_complete(df1, df2, match):
 
     assert all(isinstance(i, int) for i in out1.private_index)
     assert all(isinstance(i, int) for i in out2.private_index)
+
+
+@pytest.mark.parametrize(
+    "match,expected",
+    [
+        (([0, 1, 2], [2, 1, 0]), "True positives 3; false positives 0"),
+        (([0, 1], [0, 1]), "True positives 1; false positives 1"),
+        (([], []), "True positives 0; false positives 0"),
+    ],
+)
+def test_calculate_performance(caplog, match, expected):
+    """Check the true and false positives are counted correctly."""
+    data_1 = pd.DataFrame(dict(true_id=["a", "b", "c"]), index=["x", "y", "z"])
+    data_2 = pd.DataFrame(dict(true_id=["c", "b", "a"]))
+
+    with caplog.at_level("INFO"):
+        perform.calculate_performance(data_1, data_2, match)
+
+    assert expected in caplog.text
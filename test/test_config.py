@@ -39,14 +39,15 @@ def test_find_directory(kind, what):
 def test_load_environment_with_filename(filename):
     """Test the config loader works with a file name."""
 
+    config._read_environment.cache_clear()
     with (
         mock.patch("pprl.config.dotenv.dotenv_values") as values,
         mock.patch("pprl.config.os.path.join") as join,
     ):
-        values.return_value = "foo"
+        values.return_value = {"FOO": "bar"}
         result = config.load_environment(filename)
 
-    assert result == "foo"
+    assert result == {"FOO": "bar"}
 
     values.assert_called_once_with(filename)
     join.assert_not_called()
@@ -55,10 +56,44 @@ def test_load_environment_with_filename(filename):
 def test_load_environment_default():
     """Test the config loader works without a file name."""
 
+    config._read_environment.cache_clear()
     with mock.patch("pprl.config.dotenv.dotenv_values") as values:
-        values.return_value = "foo"
+        values.return_value = {"FOO": "bar"}
         result = config.load_environment()
 
-    assert result == "foo"
+    assert result == {"FOO": "bar"}
 
     values.assert_called_once_with(os.path.join(config.PPRL_ROOT, ".env"))
+
+
+def test_load_environment_cached(tmp_path):
+    """Test the config loader only re-reads a file once it changes."""
+
+    path = tmp_path / ".env"
+    path.write_text("FOO=bar")
+
+    config._read_environment.cache_clear()
+    with mock.patch("pprl.config.dotenv.dotenv_values") as values:
+        values.return_value = {"FOO": "bar"}
+        config.load_environment(str(path))
+        config.load_environment(str(path))
+
+        values.assert_called_once_with(str(path))
+
+        os.utime(path, (0, 0))
+        config.load_environment(str(path))
+
+    assert values.call_count == 2
+
+
+def test_load_environment_returns_copy(tmp_path):
+    """Test changing a loaded config does not change later loads."""
+
+    path = tmp_path / ".env"
+    path.write_text("FOO=bar")
+
+    config._read_environment.cache_clear()
+    first = config.load_environment(str(path))
+    first["FOO"] = "baz"
+
+    assert config.load_environment(str(path)) == {"FOO": "bar"}
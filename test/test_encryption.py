@@ -2,6 +2,7 @@
 
 import pandas as pd
 import pytest
+from cryptography.fernet import Fernet
 
 from pprl import encryption
 
@@ -31,3 +32,48 @@ def test_encrypt_decrypt_data(input_df):
     payload, data_enc_key = encryption.encrypt_data(input_df)
     decrypted_dataframe = encryption.decrypt_data(payload, data_enc_key)
     assert input_df.equals(decrypted_dataframe.reset_index(drop=True))
+
+
+def test_encrypt_decrypt_data_lists_and_floats():
+    """Check list columns come back as lists and floats are exact."""
+
+    input_df = pd.DataFrame(
+        dict(bf_indices=[[1, 2, 3], [], [1023]], bf_norms=[0.1, 1 / 3, 2**0.5])
+    )
+
+    payload, data_enc_key = encryption.encrypt_data(input_df)
+    decrypted_dataframe = encryption.decrypt_data(payload, data_enc_key)
+
+    assert input_df.equals(decrypted_dataframe)
+    assert all(isinstance(indices, list) for indices in decrypted_dataframe["bf_indices"])
+
+
+def test_decrypt_data_json_payload():
+    """Check data encrypted as JSON can still be decrypted."""
+
+    input_df = pd.DataFrame(dict(ints=[1, 2], strings=["a", "b"]))
+    key = Fernet.generate_key()
+    payload = Fernet(key).encrypt(input_df.to_json().encode("utf-8"))
+
+    decrypted_dataframe = encryption.decrypt_data(payload, key)
+
+    assert input_df.equals(decrypted_dataframe.reset_index(drop=True))
+
+
+@pytest.mark.parametrize(
+    "input_df",
+    [
+        pd.DataFrame(dict(dicts=[{"x": 1}, {"y": "z"}])),
+        pd.DataFrame(dict(lists=[[{"x": 1}], [{"y": "z"}]])),
+        pd.DataFrame(dict(ints=[1, 2], complexes=[1 + 2j, 3j])),
+    ],
+)
+def test_encrypt_decrypt_data_json_fallback(input_df):
+    """Check frames Arrow cannot hold faithfully are encrypted as JSON."""
+
+    payload, data_enc_key = encryption.encrypt_data(input_df)
+    decrypted = Fernet(data_enc_key).decrypt(payload)
+    decrypted_dataframe = encryption.decrypt_data(payload, data_enc_key)
+
+    assert decrypted.startswith(b"{")
+    assert decrypted_dataframe.reset_index(drop=True).iloc[:, 0].equals(input_df.iloc[:, 0])
@@ -0,0 +1,21 @@
+"""Unit tests for the `utils` module."""
+
+import pyarrow as pa
+import pytest
+
+from pprl import utils
+
+
+@pytest.mark.parametrize(
+    "dtype",
+    [pa.list_(pa.int64()), pa.large_list(pa.int64()), pa.list_(pa.int64(), 2)],
+)
+def test_arrow_to_pandas_lists(dtype):
+    """Check every kind of Arrow list column comes back as lists."""
+
+    table = pa.table(dict(bf_indices=pa.array([[1, 2], None, [3, 4]], type=dtype)))
+
+    data = utils.arrow_to_pandas(table)
+
+    assert data["bf_indices"].to_list() == [[1, 2], None, [3, 4]]
+    assert isinstance(data["bf_indices"][0], list)